@@ -1,19 +1,14 @@
 import streamlit as st
 import folium
 from streamlit_folium import st_folium
-import os, sys, json
+import os, json, copy
+from functools import partial
 import pandas as pd
 import numpy as np
 from datetime import datetime
 from fpdf import FPDF
 
-current_dir = os.path.dirname(os.path.abspath(__file__))
-if current_dir not in sys.path:
-    sys.path.insert(0, current_dir)
-
-from carbon_simulator import CarbonCreditSimulator, UPLIFT_CITATIONS
-
-RSR_CITATION = "IPCC 2019 Refinement Vol.4 Ch.4 Table 4.4"
+from carbon_simulator import CarbonCreditSimulator, UPLIFT_CITATIONS, RSR_CITATION
 
 # TerraPod technology uplifts — ISB/EAD/ICBA trial, Abu Dhabi, Nov 2024
 # Reference: EAD/EQS/2024/1935 — Completion of Trial on ISB Technology
@@ -46,21 +41,15 @@ st.set_page_config(
     layout="wide",
 )
 
-def get_ecoregion(lat, lon):
-    """
-    Estimate WWF ecoregion from lat/lon.
-    Checks specific biome polygons before falling back to latitude bands.
-    Covers: deserts, mangroves, dry broadleaf, montane, flooded, mediterranean,
-            tropical moist, tropical grasslands, temperate, boreal.
-    """
-    abs_lat = abs(lat)
-
+# ── Biome bounding boxes (lat_min, lat_max, lon_min, lon_max) ─────────────────
+# Listed in priority order — the first zone containing a point wins.  Stacked
+# into one array below so get_ecoregion tests every box in a single pass.
+BIOME_ZONES = [
     # ── 1. MANGROVES — coastal tropical/subtropical (check first) ──────────────
     # Only flag as mangrove if very close to coast (rough heuristic: low elevation
     # proxy = within known mangrove latitude bands near coastlines)
-    # Key mangrove regions worldwide
     # Known mangrove hotspot bounding boxes (tighter zones = more coastal)
-    mangrove_hotspots = [
+    ("mangroves", [
         (4, 6, -3, 2),        # Ghana / Benin coast (tight coastal strip)
         (-1, 4, 8, 12),       # Cameroon / Niger Delta
         (-10, -5, 13, 16),    # Angola coast
@@ -73,37 +62,25 @@ def get_ecoregion(lat, lon):
         (8, 12, -85, -82),    # Costa Rica / Panama coast
         (10, 14, -87, -83),   # Honduras / Nicaragua coast
         (-22, -18, 115, 118), # NW Australia coast
-    ]
-    for lat_min, lat_max, lon_min, lon_max in mangrove_hotspots:
-        if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max:
-            return "mangroves"
-
+    ]),
     # ── 2. FLOODED GRASSLANDS — specific regions ───────────────────────────────
-    flooded_zones = [
+    ("flooded grasslands and savannas", [
         (-20, -15, 18, 26),   # Okavango / Zambezi floodplains
         (-18, -12, 26, 34),   # Bangweulu / Kafue flats
         (8, 14, 13, 17),      # Lake Chad basin
         (-20, -10, -65, -55), # Pantanal (Brazil/Bolivia)
         (25, 30, 85, 92),     # Brahmaputra floodplain
-    ]
-    for lat_min, lat_max, lon_min, lon_max in flooded_zones:
-        if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max:
-            return "flooded grasslands and savannas"
-
+    ]),
     # ── 3. MONTANE GRASSLANDS ──────────────────────────────────────────────────
-    montane_zones = [
+    ("montane grasslands and shrublands", [
         (-5, 5, 32, 37),      # East African highlands (Kenya, Uganda, Tanzania)
         (5, 15, 35, 42),      # Ethiopian highlands
         (-25, -10, -75, -65), # Andes highlands
         (25, 35, 80, 100),    # Himalayan foothills
         (-45, -35, -75, -65), # Patagonian Andes
-    ]
-    for lat_min, lat_max, lon_min, lon_max in montane_zones:
-        if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max:
-            return "montane grasslands and shrublands"
-
+    ]),
     # ── 4. DESERTS & XERIC SHRUBLANDS ─────────────────────────────────────────
-    desert_zones = [
+    ("deserts and xeric shrublands", [
         (12, 38, 32, 65),     # Arabian Peninsula / Middle East
         (15, 35, -18, 40),    # Sahara / North Africa
         (25, 45, 50, 70),     # Iranian / Central Asian deserts
@@ -112,22 +89,33 @@ def get_ecoregion(lat, lon):
         (35, 50, 80, 120),    # Gobi / Central Asian steppe
         (25, 40, -120, -100), # Southwest USA (Mojave, Sonoran)
         (20, 30, -18, 20),    # Sahel transition
-    ]
-    for lat_min, lat_max, lon_min, lon_max in desert_zones:
-        if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max:
-            return "deserts and xeric shrublands"
-
+    ]),
     # ── 5. TROPICAL DRY BROADLEAF ─────────────────────────────────────────────
-    dry_broadleaf_zones = [
+    ("tropical and subtropical dry broadleaf forests", [
         (10, 25, 68, 88),     # Indian subcontinent dry zone
         (5, 18, -18, 15),     # West African dry zone (Guinea savanna)
         (-20, -5, 28, 38),    # East African dry broadleaf (Zambia, Mozambique, not Okavango)
         (-25, -10, -55, -40), # Brazilian dry forest (Caatinga)
         (8, 20, -90, -75),    # Central American dry forest
-    ]
-    for lat_min, lat_max, lon_min, lon_max in dry_broadleaf_zones:
-        if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max:
-            return "tropical and subtropical dry broadleaf forests"
+    ]),
+]
+ZONE_BOXES  = np.array([box for _, boxes in BIOME_ZONES for box in boxes], dtype=float)
+ZONE_LABELS = [eco for eco, boxes in BIOME_ZONES for _ in boxes]
+
+def get_ecoregion(lat, lon):
+    """
+    Estimate WWF ecoregion from lat/lon.
+    Checks specific biome polygons before falling back to latitude bands.
+    Covers: deserts, mangroves, dry broadleaf, montane, flooded, mediterranean,
+            tropical moist, tropical grasslands, temperate, boreal.
+    """
+    abs_lat = abs(lat)
+
+    # ── 1-5. Biome boxes — one vectorised containment test, first hit wins ───
+    hit = ((ZONE_BOXES[:, 0] <= lat) & (lat <= ZONE_BOXES[:, 1]) &
+           (ZONE_BOXES[:, 2] <= lon) & (lon <= ZONE_BOXES[:, 3]))
+    if hit.any():
+        return ZONE_LABELS[int(hit.argmax())]
 
     # ── 6. BOREAL / TAIGA ─────────────────────────────────────────────────────
     if abs_lat > 60:
@@ -195,66 +183,125 @@ def pdf_safe(text):
         t = t.replace(bad, good)
     return t.encode('latin-1', errors='replace').decode('latin-1')
 
-@st.cache_data(ttl=0)
-def load_species_data():
-    return pd.read_csv("allometric_equations.csv")
-
-@st.cache_data(ttl=0)
-def load_native_species():
-    df = pd.read_csv("native_species.csv")
+SPECIES_CSV = "allometric_equations.csv"
+NATIVE_CSV  = "native_species.csv"
+MAX_SPECIES = 5
+
+def file_mtime(path):
+    """Cache key for data loaders — an edited CSV gets reloaded on next rerun."""
+    return os.path.getmtime(path)
+
+# cache_resource hands every rerun the same frame instead of a deep copy.
+# Callers must treat these DataFrames as read-only. Loaders keyed on a file's
+# mtime keep only the current version, so an edited CSV doesn't pin the old one.
+@st.cache_resource(max_entries=1)
+def load_species_data(mtime):
+    # pyarrow ships with streamlit; its reader beats the C engine on this file.
+    # The app only builds species labels, so the equation columns are skipped.
+    return pd.read_csv(SPECIES_CSV, engine="pyarrow",
+                       usecols=["species_name", "common_name", "region"])
+
+@st.cache_resource(max_entries=1)
+def load_native_species(mtime):
+    df = pd.read_csv(NATIVE_CSV)
     df["ecoregion"] = df["ecoregion"].str.strip().str.lower()
     return df
 
-@st.cache_resource(ttl=0)
-def load_simulator():
+@st.cache_data(max_entries=32)   # one set per ecoregion (10 in the CSV) of the current version
+def load_native_set(ecoregion, mtime):
+    """Species confirmed native to one ecoregion — a set, so filtering is O(1) per name."""
+    df = load_native_species(mtime)
+    return frozenset(df.loc[df["ecoregion"] == ecoregion, "species_name"])
+
+@st.cache_data(max_entries=1)
+def load_species_by_region(mtime):
+    """
+    Region -> species records sorted by display label, built once per CSV version.
+    Each record carries the "Common (Latin)" label shown in widgets plus the
+    pre-split species_name / common_name, so nothing re-parses the label.
+    """
+    df     = load_species_data(mtime)
+    common = df["common_name"].fillna(df["species_name"])
+    recs   = pd.DataFrame({
+        "display"     : common + " (" + df["species_name"] + ")",
+        "species_name": df["species_name"],
+        "common_name" : common,
+        "region"      : df["region"],
+    }).dropna(subset=["region"]).drop_duplicates(["region", "display"]).sort_values("display")
+    return {
+        region: g[["display", "species_name", "common_name"]].to_dict("records")
+        for region, g in recs.groupby("region")
+    }
+
+@st.cache_resource
+def load_simulator(data_path="allometric_equations.csv",
+                   globallometree_path="globallometree_usable.json"):
+    """One simulator per process — equation tables are static, so no TTL."""
     return CarbonCreditSimulator(
-        data_path="allometric_equations.csv",
-        globallometree_path="globallometree_usable.json",
+        data_path=data_path,
+        globallometree_path=globallometree_path,
+    )
+
+@st.cache_data(show_spinner=False, max_entries=128)   # process-wide; least recently used evicted
+def run_simulation(area_ha, species_mix, project_years, annual_mortality,
+                   management, managed_restoration):
+    """Yearly results per input set — re-clicking Calculate skips the 40-year loop."""
+    return load_simulator().simulate_project(
+        area_ha=area_ha, species_mix=species_mix,
+        project_years=project_years, annual_mortality=annual_mortality,
+        management=management,
+        managed_restoration=managed_restoration,
     )
 
 def generate_pdf_report(area_ha, species_mix, gross_credits, buffer_pct,
                          soil_gross, management, audit_trail, project_years):
+    """PDF bytes for one report. Not cached — the Generated stamp must be the download time."""
     pdf = FPDF()
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=15)
 
     pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "VCS Reforestation Carbon Credit Report", ln=True, align="C")
+    pdf.cell(0, 10, "VCS Reforestation Carbon Credit Report", new_x="LMARGIN", new_y="NEXT", align="C")
     pdf.set_font("Arial", "", 10)
-    pdf.cell(0, 6, pdf_safe(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}  |  Methodology: Verra VM0047"), ln=True, align="C")
+    pdf.cell(0, 6, pdf_safe(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}  |  Methodology: Verra VM0047"), new_x="LMARGIN", new_y="NEXT", align="C")
     pdf.ln(4)
 
     net_credits   = gross_credits * (1 - buffer_pct / 100.0)
     buffer_amount = gross_credits * buffer_pct / 100.0
 
     pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 8, "Carbon Credit Summary", ln=True)
+    pdf.cell(0, 8, "Carbon Credit Summary", new_x="LMARGIN", new_y="NEXT")
     pdf.set_font("Arial", "", 11)
-    pdf.cell(0, 7, pdf_safe(f"Project area:          {area_ha:,.0f} ha"), ln=True)
-    pdf.cell(0, 7, pdf_safe(f"Crediting period:      {project_years} years"), ln=True)
-    pdf.cell(0, 7, pdf_safe(f"Gross sequestration:   {gross_credits:,.0f} tCO2e"), ln=True)
-    pdf.cell(0, 7, pdf_safe(f"  - Biomass:           {gross_credits - soil_gross:,.0f} tCO2e"), ln=True)
-    pdf.cell(0, 7, pdf_safe(f"  - Soil:              {soil_gross:,.0f} tCO2e"), ln=True)
-    pdf.cell(0, 7, pdf_safe(f"Buffer pool ({buffer_pct}%):     {buffer_amount:,.0f} tCO2e"), ln=True)
-    pdf.cell(0, 7, pdf_safe(f"Net issuable VCUs:     {net_credits:,.0f} tCO2e"), ln=True)
-    pdf.cell(0, 7, pdf_safe(f"VCS net (-20% disc.):  {net_credits * 0.8:,.0f} tCO2e"), ln=True)
+    summary = [
+        f"Project area:          {area_ha:,.0f} ha",
+        f"Crediting period:      {project_years} years",
+        f"Gross sequestration:   {gross_credits:,.0f} tCO2e",
+        f"  - Biomass:           {gross_credits - soil_gross:,.0f} tCO2e",
+        f"  - Soil:              {soil_gross:,.0f} tCO2e",
+        f"Buffer pool ({buffer_pct}%):     {buffer_amount:,.0f} tCO2e",
+        f"Net issuable VCUs:     {net_credits:,.0f} tCO2e",
+        f"VCS net (-20% disc.):  {net_credits * 0.8:,.0f} tCO2e",
+    ]
+    pdf.multi_cell(0, 7, pdf_safe("\n".join(summary)), new_x="LMARGIN", new_y="NEXT")
     pdf.ln(3)
 
     pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 8, "Management Practices", ln=True)
+    pdf.cell(0, 8, "Management Practices", new_x="LMARGIN", new_y="NEXT")
     pdf.set_font("Arial", "", 10)
+    practices = []
     if management.get("irrigation"):
-        pdf.cell(0, 6, pdf_safe("  Irrigation: +15% DBH growth  [IPCC 2019 Vol.4 Ch.2 s2.3.2]"), ln=True)
+        practices.append("  Irrigation: +15% DBH growth  [IPCC 2019 Vol.4 Ch.2 s2.3.2]")
     if management.get("nutrients"):
-        pdf.cell(0, 6, pdf_safe("  Nutrients:  +10% DBH growth  [IPCC 2019]"), ln=True)
+        practices.append("  Nutrients:  +10% DBH growth  [IPCC 2019]")
     if management.get("biochar"):
-        pdf.cell(0, 6, pdf_safe("  Biochar:    +10% growth, +5 tC/ha soil  [Jeffery et al. 2017]"), ln=True)
-    if not any([management.get("irrigation"), management.get("nutrients"), management.get("biochar")]):
-        pdf.cell(0, 6, "No management uplifts applied (conservative baseline)", ln=True)
+        practices.append("  Biochar:    +10% growth, +5 tC/ha soil  [Jeffery et al. 2017]")
+    if not practices:
+        practices.append("No management uplifts applied (conservative baseline)")
+    pdf.multi_cell(0, 6, pdf_safe("\n".join(practices)), new_x="LMARGIN", new_y="NEXT")
     pdf.ln(3)
 
     pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 8, "Species Mix & Equation Sources", ln=True)
+    pdf.cell(0, 8, "Species Mix & Equation Sources", new_x="LMARGIN", new_y="NEXT")
     pdf.set_font("Arial", "", 10)
     for spec in species_mix:
         eq_info = audit_trail.get("species_equations", {}).get(spec["species_name"], {})
@@ -263,15 +310,15 @@ def generate_pdf_report(area_ha, species_mix, gross_credits, buffer_pct,
         pdf.cell(0, 6, pdf_safe(
             f"  {spec['common_name']} ({spec['species_name']}): "
             f"{spec['pct']}%  |  {spec['density']} stems/ha  |  {tier}"
-        ), ln=True)
+        ), new_x="LMARGIN", new_y="NEXT")
         if cite:
             pdf.set_font("Arial", "I", 8)
-            pdf.cell(0, 5, f"    Cite: {cite}", ln=True)
+            pdf.cell(0, 5, f"    Cite: {cite}", new_x="LMARGIN", new_y="NEXT")
             pdf.set_font("Arial", "", 10)
     pdf.ln(3)
 
     pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 8, "VCS-Required Constants", ln=True)
+    pdf.cell(0, 8, "VCS-Required Constants", new_x="LMARGIN", new_y="NEXT")
     pdf.set_font("Arial", "", 10)
     constants = [
         ("Carbon fraction",    "0.47",  "IPCC 2006 Table 4.3"),
@@ -284,13 +331,15 @@ def generate_pdf_report(area_ha, species_mix, gross_credits, buffer_pct,
         ("Uncertainty disc.",  "20%",   "VCS Uncertainty & Variance Policy v4"),
         ("Equation database",  "GlobAllomeTree + allometric_equations.csv", "Peer-reviewed"),
     ]
-    for label, value, citation in constants:
-        pdf.cell(0, 6, pdf_safe(f"  {label}: {value}  [{citation}]"), ln=True)
+    pdf.multi_cell(0, 6, pdf_safe("\n".join(
+        f"  {label}: {value}  [{citation}]" for label, value, citation in constants
+    )), new_x="LMARGIN", new_y="NEXT")
     pdf.ln(3)
 
     pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 8, "VVB Audit Trail", ln=True)
+    pdf.cell(0, 8, "VVB Audit Trail", new_x="LMARGIN", new_y="NEXT")
     pdf.set_font("Arial", "", 9)
+    audit_lines = []
     for key, val in audit_trail.items():
         if key in ("species_equations", "management_uplifts"):
             continue
@@ -298,13 +347,14 @@ def generate_pdf_report(area_ha, species_mix, gross_credits, buffer_pct,
             val = "; ".join(val)
         elif isinstance(val, dict):
             val = str(val)
-        pdf.cell(0, 5, pdf_safe(f"  {key}: {str(val)[:90]}"), ln=True)
+        audit_lines.append(f"  {key}: {str(val)[:90]}")
+    pdf.multi_cell(0, 5, pdf_safe("\n".join(audit_lines)), new_x="LMARGIN", new_y="NEXT")
 
     pdf.ln(5)
     pdf.set_font("Arial", "I", 8)
-    pdf.cell(0, 5, "Feasibility estimate only. VCUs require Verra validation and verification.", ln=True)
+    pdf.cell(0, 5, "Feasibility estimate only. VCUs require Verra validation and verification.", new_x="LMARGIN", new_y="NEXT")
 
-    return bytes(pdf.output(dest="S"))
+    return bytes(pdf.output())
 
 
 # ── App ────────────────────────────────────────────────────────────────────────
@@ -312,37 +362,56 @@ st.title("🌳 VCS Reforestation Carbon Credit Estimator")
 st.caption("Verra VM0047 (Soil + Vegetation Carbon)  |  GlobAllomeTree equations  |  IPCC 2019 RSR  |  VVB-defensible audit trail")
 
 try:
-    species_df = load_species_data()
-    native_df  = load_native_species()
-    sim        = load_simulator()
+    # Eager load so a missing or broken data file stops here with st.error
+    load_species_data(file_mtime(SPECIES_CSV))
+    load_native_species(file_mtime(NATIVE_CSV))
+    sim = load_simulator()
 except Exception as e:
     st.error(f"Error loading data: {e}")
     st.stop()
 
-if "lat" not in st.session_state:
-    st.session_state.lat       = -3.4653
-    st.session_state.lon       = -62.2153
-    st.session_state.ecoregion = "tropical and subtropical moist broadleaf forests"
+for key, default in {
+    "lat"      : -3.4653,
+    "lon"      : -62.2153,
+    "ecoregion": "tropical and subtropical moist broadleaf forests",
+    "region"   : "tropical",
+}.items():
+    st.session_state.setdefault(key, default)
+
+@st.cache_resource(max_entries=32)   # keyed on exact click coords; only the current point is reused
+def build_map(lat, lon):
+    """Folium map + marker for a location, built once per (lat, lon)."""
+    m = folium.Map(location=[lat, lon], zoom_start=4)
+    folium.Marker(
+        [lat, lon],
+        popup="Project Location",
+        icon=folium.Icon(color="green"),
+    ).add_to(m)
+    m.get_root().render()   # full HTML render once; st_folium is called with render=False
+    return m
 
 st.subheader("📍 Project Location")
-m = folium.Map(location=[st.session_state.lat, st.session_state.lon], zoom_start=4)
-folium.Marker(
-    [st.session_state.lat, st.session_state.lon],
-    popup="Project Location",
-    icon=folium.Icon(color="green"),
-).add_to(m)
-map_data = st_folium(m, width=700, height=300)
-
+# st_folium renders into the map it is given (re-rendering appends duplicate
+# JS), so hand it a copy of the cached template.  The copy keeps the element
+# ids stable across reruns, so the frontend sees an unchanged map.
+m = copy.deepcopy(build_map(st.session_state.lat, st.session_state.lon))
+map_data = st_folium(m, width=700, height=300, key="projmap",
+                     returned_objects=["last_clicked"], render=False)
+
+# st_folium keeps reporting the last click on every rerun, so only re-derive
+# the ecoregion/region when the clicked point actually moves.
 if map_data and map_data.get("last_clicked"):
-    st.session_state.lat       = map_data["last_clicked"]["lat"]
-    st.session_state.lon       = map_data["last_clicked"]["lng"]
-    st.session_state.ecoregion = get_ecoregion(st.session_state.lat, st.session_state.lon)
+    latlon = (map_data["last_clicked"]["lat"], map_data["last_clicked"]["lng"])
+    if st.session_state.get("_cached_latlon") != latlon:
+        st.session_state.lat, st.session_state.lon = latlon
+        st.session_state.ecoregion = get_ecoregion(*latlon)
+        st.session_state.region    = eco_to_region(st.session_state.ecoregion)
+        st.session_state._cached_latlon = latlon
 
 # ── Country-specific data panel ───────────────────────────────────────────────
 @st.cache_data
 def load_country_data():
     """Load country-specific species data from JSON files."""
-    import os
     data = {}
     try:
         path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "morocco_data.json")
@@ -405,7 +474,6 @@ if detected_country and detected_country in COUNTRY_DATA:
                 "Drought": sp_data.get("drought_resistance", ""),
                 "Endemic": "🌿" if sp_data.get("endemic") else "",
             })
-        import pandas as pd
         st.table(pd.DataFrame(mix_rows))
 
         # Endemic species highlight
@@ -425,15 +493,8 @@ if detected_country and detected_country in COUNTRY_DATA:
         st.caption(f"Source: {src['based_on']}")
     st.divider()
 
-st.sidebar.header("Project Parameters")
 st.sidebar.info(f"Ecoregion detected:\n**{st.session_state.ecoregion.title()}**")
-detected_region = eco_to_region(st.session_state.ecoregion)
-
-area_ha       = st.sidebar.number_input("Project area (ha)", min_value=1, value=100)
-project_years = st.sidebar.slider("Crediting period (years)", 20, 60, 40)
-mortality     = st.sidebar.number_input("Annual mortality (%)", 0, 20, 4) / 100.0
-buffer_pct    = st.sidebar.slider("Buffer pool (%)", 10, 30, 20,
-                                   help="VCS minimum 10%")
+detected_region = st.session_state.region
 
 st.sidebar.subheader("Management Practices")
 st.sidebar.caption("Fixed uplifts per peer-reviewed literature")
@@ -517,61 +578,84 @@ management = {
     "terrapod"    : terrapod_key,
 }
 
-st.sidebar.subheader("Species")
+project_form = st.sidebar.form("project_form")
+project_form.header("Project Parameters")
+area_ha       = project_form.number_input("Project area (ha)", min_value=1, value=100)
+project_years = project_form.slider("Crediting period (years)", 20, 60, 40)
+mortality     = project_form.number_input("Annual mortality (%)", 0, 20, 4) / 100.0
+buffer_pct    = project_form.slider("Buffer pool (%)", 10, 30, 20,
+                                     help="VCS minimum 10%")
+
+project_form.subheader("Species")
 ecoregion_key  = st.session_state.ecoregion.lower().strip()
-native_species = native_df[native_df["ecoregion"] == ecoregion_key]["species_name"].tolist()
-
-species_by_region = {}
-for region_val in species_df["region"].dropna().unique():
-    rdf = species_df[species_df["region"] == region_val]
-    display = []
-    for _, row in rdf.iterrows():
-        common = row.get("common_name", row["species_name"])
-        if pd.isna(common): common = row["species_name"]
-        display.append(f"{common} ({row['species_name']})")
-    species_by_region[region_val] = sorted(set(display))
+native_species = load_native_set(ecoregion_key, file_mtime(NATIVE_CSV))
+
+species_by_region = load_species_by_region(file_mtime(SPECIES_CSV))
 
 full_list     = species_by_region.get(detected_region, [])
-filtered_list = []
-for disp in full_list:
-    try:
-        sp_name = disp.split("(")[1].rstrip(")")
-        if sp_name in native_species:
-            filtered_list.append(disp)
-    except:
-        continue
+filtered_list = [r for r in full_list if r["species_name"] in native_species]
 
 if not filtered_list:
-    st.sidebar.warning(
+    project_form.warning(
         f"No native species with allometric data found for **{st.session_state.ecoregion.title()}**. "
         "Showing all regional species — note these may not be confirmed native to your exact location. "
         "Consider uploading a custom species CSV with locally verified native species."
     )
-    filtered_list = full_list or ["Tectona grandis (Tectona grandis)"]
+    filtered_list = full_list or [{"display"     : "Tectona grandis (Tectona grandis)",
+                                   "species_name": "Tectona grandis",
+                                   "common_name" : "Tectona grandis"}]
 else:
-    st.sidebar.success(
+    project_form.success(
         f"Showing {len(filtered_list)} confirmed native species for {st.session_state.ecoregion.title()}."
     )
 
-species_options = filtered_list
+species_options = [r["display"] for r in filtered_list]
+species_lookup  = {r["display"]: r for r in filtered_list}
+species_index   = {d: i for i, d in enumerate(species_options)}
 
 if "species_list" not in st.session_state:
     st.session_state.species_list = [{"display": species_options[0], "pct": 100, "density": 1100}]
 
-for i, spec in enumerate(st.session_state.species_list):
-    cols = st.sidebar.columns([3, 1, 1])
-    spec["display"]  = cols[0].selectbox(f"Species {i+1}", species_options,
-                                          index=min(i, len(species_options)-1), key=f"sp_{i}")
-    spec["pct"]      = cols[1].number_input(f"% {i+1}", 0, 100, spec["pct"], key=f"pct_{i}")
-    spec["density"]  = cols[2].number_input(f"Dens {i+1}", 100, 5000, spec["density"], key=f"den_{i}")
-
-c1, c2 = st.sidebar.columns(2)
-if c1.button("+ Add"):
-    if len(st.session_state.species_list) < 5:
-        st.session_state.species_list.append({"display": species_options[0], "pct": 0, "density": 1100})
-if c2.button("- Remove"):
-    if len(st.session_state.species_list) > 1:
-        st.session_state.species_list.pop()
+def fit_species_rows(rows):
+    """Clamp edited rows to the current options — unknown/blank species fall back by position."""
+    fitted = []
+    for i, row in enumerate(rows[:MAX_SPECIES]):
+        display = row["display"]
+        if display not in species_index:
+            display = species_options[min(i, len(species_options)-1)]
+        fitted.append({"display": display, "pct": int(row["pct"]), "density": int(row["density"])})
+    return fitted
+
+# data_editor replays its edits onto the frame it is given, so that frame is
+# only rebuilt (and the edit state reset) when the species options change.
+if st.session_state.get("species_options_key") != (detected_region, ecoregion_key):
+    st.session_state.species_options_key = (detected_region, ecoregion_key)
+    st.session_state.species_base = pd.DataFrame(
+        fit_species_rows(st.session_state.species_list), columns=["display", "pct", "density"]
+    )
+    st.session_state.pop("species_editor", None)
+
+edited = project_form.data_editor(
+    st.session_state.species_base,
+    key="species_editor",
+    num_rows="dynamic",
+    hide_index=True,
+    column_config={
+        "display": st.column_config.SelectboxColumn("Species", options=species_options,
+                                                    default=species_options[0], required=True),
+        "pct"    : st.column_config.NumberColumn("%", min_value=0, max_value=100, step=1,
+                                                 default=0, required=True),
+        "density": st.column_config.NumberColumn("Dens", min_value=100, max_value=5000, step=1,
+                                                 default=1100, required=True),
+    },
+)
+if len(edited) > MAX_SPECIES:
+    project_form.warning(f"Only the first {MAX_SPECIES} species are used.")
+st.session_state.species_list = fit_species_rows(
+    edited.fillna({"pct": 0, "density": 1100}).to_dict("records")
+)
+
+submitted = project_form.form_submit_button("Calculate Carbon Credits", type="primary")
 
 total_pct = sum(s["pct"] for s in st.session_state.species_list)
 if total_pct != 100:
@@ -1116,22 +1200,17 @@ if bm_data:
     except Exception as _e:
         st.caption(f"Regional estimate unavailable: {_e}")
 
-if st.sidebar.button("Calculate Carbon Credits", type="primary") and total_pct == 100:
+if submitted and total_pct == 100:
     with st.spinner("Simulating..."):
         try:
             species_mix = []
             for spec in st.session_state.species_list:
                 if spec["pct"] <= 0:
                     continue
-                disp = spec["display"]
-                if "(" in disp:
-                    common_name  = disp.split(" (")[0]
-                    species_name = disp.split(" (")[1].rstrip(")")
-                else:
-                    species_name = common_name = disp
+                rec = species_lookup[spec["display"]]
                 species_mix.append({
-                    "species_name": species_name,
-                    "common_name" : common_name,
+                    "species_name": rec["species_name"],
+                    "common_name" : rec["common_name"],
                     "region"      : detected_region,
                     "pct"         : spec["pct"],
                     "density"     : spec["density"],
@@ -1147,16 +1226,15 @@ if st.sidebar.button("Calculate Carbon Credits", type="primary") and total_pct =
                 management["terrapod_growth_mult"] = tp["dbh_growth_mult"]
                 terrapod_info = tp
 
-            results      = sim.simulate_project(
-                area_ha=area_ha, species_mix=species_mix,
-                project_years=project_years, annual_mortality=effective_mortality,
-                management=management,
-                managed_restoration=use_managed_restoration,
+            results      = run_simulation(
+                area_ha, species_mix, project_years, effective_mortality,
+                management, use_managed_restoration,
             )
+            res_df   = pd.DataFrame(results, columns=["year", "co2e_gross_t", "soil_co2e_gross_t"])
+            soil_cum = res_df["soil_co2e_gross_t"].to_numpy().cumsum()  # soil IS cumulative annual
             # Carbon stock at END of crediting period (not sum of annual stocks)
-            final         = results[-1]
-            gross_biomass = final["co2e_gross_t"]
-            gross_soil    = sum(r["soil_co2e_gross_t"] for r in results)  # soil IS cumulative annual
+            gross_biomass = float(res_df["co2e_gross_t"].iat[-1])
+            gross_soil    = float(soil_cum[-1])
             gross_total   = gross_biomass + gross_soil
             buffer_held   = gross_total * (buffer_pct / 100.0)
             net_total     = gross_total * (1 - buffer_pct / 100.0)
@@ -1187,17 +1265,10 @@ if st.sidebar.button("Calculate Carbon Credits", type="primary") and total_pct =
 
             st.subheader("Cumulative Carbon Accumulation")
             # Chart: biomass stock at each year + cumulative soil
-            years, cum_gross, cum_net = [], [], []
-            cumulative_soil = 0
-            for r in results:
-                cumulative_soil += r["soil_co2e_gross_t"]
-                total_stock = r["co2e_gross_t"] + cumulative_soil
-                years.append(r["year"])
-                cum_gross.append(round(total_stock, 0))
-                cum_net.append(round(total_stock * (1 - buffer_pct/100), 0))
-
-            chart_df = pd.DataFrame({"Year": years, "Gross tCO2e": cum_gross, "Net VCUs": cum_net})
-            st.line_chart(chart_df, x="Year", y=["Gross tCO2e", "Net VCUs"])
+            total_stock = res_df["co2e_gross_t"].to_numpy() + soil_cum
+            res_df["Gross tCO2e"] = np.round(total_stock, 0)
+            res_df["Net VCUs"]    = np.round(total_stock * (1 - buffer_pct/100), 0)
+            st.line_chart(res_df, x="year", y=["Gross tCO2e", "Net VCUs"], x_label="Year")
 
             st.subheader("Species Mix & Equation Sources")
             mix_rows = []
@@ -1242,13 +1313,14 @@ if st.sidebar.button("Calculate Carbon Credits", type="primary") and total_pct =
                              f"Growth +{(tp['dbh_growth_mult']-1)*100:.0f}%")
                     st.write(f"**TerraPod citation:** {TERRAPOD_CITATION}")
 
-            pdf_bytes = generate_pdf_report(
-                area_ha, species_mix, gross_total, buffer_pct,
-                gross_soil, management, audit, project_years,
-            )
+            # Built on click only, so the report's Generated stamp is the download time
             st.download_button(
                 label="Download VCS Report (PDF)",
-                data=pdf_bytes,
+                data=partial(
+                    generate_pdf_report,
+                    area_ha, species_mix, gross_total, buffer_pct,
+                    gross_soil, management, audit, project_years,
+                ),
                 file_name=f"vcs_report_{datetime.now().strftime('%Y%m%d')}.pdf",
                 mime="application/pdf",
             )
@@ -18,11 +18,13 @@ RSR (IPCC 2019 Table 4.4 — replaces flat 0.20):
 import pandas as pd
 import numpy as np
 import json, re, os, math
+from functools import lru_cache
 from pathlib import Path
 
 # ── Constants ──────────────────────────────────────────────────────────────────
 CARBON_FRACTION = 0.47        # IPCC 2006 Table 4.3
 CO2E_FACTOR     = 3.67        # C → CO2e (44/12)
+BIOMASS_KG_TO_CO2E_T = CARBON_FRACTION * CO2E_FACTOR / 1000.0   # kg dry biomass → tCO2e
 
 RSR = {"tropical": 0.235, "temperate": 0.192, "boreal": 0.390}
 RSR_DEFAULT = 0.235
@@ -417,6 +419,7 @@ SPECIES_RSR_CITATION = (
 
 # Minimum plausible AGB at DBH=10cm — filters out equations fitted to seedlings only
 AGB_SANITY_MIN_KG = 3.0   # anything below this at DBH=10 is rejected
+AGB_KG_CACHE_MAX  = 4096  # calculate_agb_kg memo entries before it is reset
 
 FAST_SPECIES = {
     "Acacia mangium","Acacia mearnsii","Eucalyptus grandis",
@@ -425,6 +428,20 @@ FAST_SPECIES = {
     "Pinus caribaea","Acacia auriculiformis",
 }
 
+# Base DBH increment (mm/yr) by region: (fast-growing species, others)
+DBH_GROWTH_MM = {
+    "tropical"          : (20.0, 12.0),   # IPCC 2019 Table 4.11
+    "dry_tropical"      : (14.0, 8.0),    # Tropical dry — slower than moist
+    "tropical_grassland": (14.0, 8.0),
+    "desert"            : (8.0, 5.0),     # Arid species — slow growth
+    "mediterranean"     : (10.0, 7.0),    # Mediterranean
+    "montane"           : (8.0, 5.0),     # High-altitude — slow
+    "mangrove"          : (10.0, 7.0),    # Wetland species
+    "flooded"           : (10.0, 7.0),
+    "temperate"         : (10.0, 8.0),    # IPCC 2019 Table 4.9
+}
+DBH_GROWTH_MM_DEFAULT = (7.0, 5.0)        # boreal and unknown — IPCC 2019 Table 4.9
+
 UPLIFT_CITATIONS = {
     "irrigation": "IPCC 2019 Vol.4 Ch.2 §2.3.2 (+15% DBH growth)",
     "nutrients" : "IPCC 2019 (+10% DBH growth)",
@@ -434,30 +451,55 @@ UPLIFT_CITATIONS = {
 SOC_DEFAULTS = {"tropical": 75, "temperate": 100, "boreal": 150}
 SOC_CITATION  = "IPCC 2019 Refinement Vol.4 Ch.4, Table 2.3 regional defaults"
 
+# Columns read from the Tier-2 allometric CSV (common_name is app-only)
+SIMPLE_CSV_COLUMNS = {"species_name", "region", "a", "b", "wood_density"}
+
+# Tier 3: IPCC 2019 regional default AGB = a * DBH^b
+TIER3_DEFAULTS = {
+    "tropical":(0.0509,2.50), "temperate":(0.065,2.38), "boreal":(0.085,2.32),
+    "desert":(0.048,2.41), "dry_tropical":(0.050,2.40), "mediterranean":(0.065,2.35),
+    "montane":(0.060,2.38), "mangrove":(0.055,2.42), "flooded":(0.058,2.40),
+    "tropical_grassland":(0.048,2.41),
+}
+# The memoized simulation lookup only distinguishes the three climate zones
+TIER3_ZONE_DEFAULTS = {k: TIER3_DEFAULTS[k] for k in ("tropical", "temperate", "boreal")}
+
 # ── Formula evaluator ──────────────────────────────────────────────────────────
+@lru_cache(maxsize=None)
+def _compile_formula(equation: str):
+    """Compile a GlobAllomeTree equation over a scalar `dbh` once. None if unusable."""
+    f = str(equation).strip()
+    if not f:
+        return None
+    # Skip equations needing wood density (Z) or height (H)
+    if re.search(r'\b[ZH]\b', f):
+        return None
+    # Substitute X → DBH
+    f = re.sub(r'\bX\b', 'dbh', f)
+    # Math function normalization
+    f = (f.replace('^', '**')
+          .replace('ln(',    'math.log(')
+          .replace('log10(', 'math.log10(')
+          .replace('Log10(', 'math.log10(')
+          .replace('log(',   'math.log(')
+          .replace('Log(',   'math.log(')
+          .replace('exp(',   'math.exp(')
+          .replace('Exp(',   'math.exp(')
+          .replace('sqrt(',  'math.sqrt('))
+    try:
+        return compile(f, "<allometry>", "eval")
+    except (SyntaxError, ValueError):
+        return None
+
+
 def _eval_formula(equation: str, output_tr: str, unit_y: str, dbh: float):
     """Evaluate a GlobAllomeTree equation string. Returns kg or None on failure."""
     try:
-        dbh = max(float(dbh), 0.5)
-        f = str(equation).strip()
-        if not f:
-            return None
-        # Skip equations needing wood density (Z) or height (H)
-        if re.search(r'\b[ZH]\b', f):
+        dbh  = max(float(dbh), 0.5)
+        code = _compile_formula(equation)
+        if code is None:
             return None
-        # Substitute X → DBH
-        f = re.sub(r'\bX\b', str(dbh), f)
-        # Math function normalization
-        f = (f.replace('^', '**')
-              .replace('ln(',    'math.log(')
-              .replace('log10(', 'math.log10(')
-              .replace('Log10(', 'math.log10(')
-              .replace('log(',   'math.log(')
-              .replace('Log(',   'math.log(')
-              .replace('exp(',   'math.exp(')
-              .replace('Exp(',   'math.exp(')
-              .replace('sqrt(',  'math.sqrt('))
-        result = eval(f, {"math": math, "__builtins__": {}})
+        result = eval(code, {"math": math, "__builtins__": {}, "dbh": dbh})
         result = float(result)
         if result <= 0 or not math.isfinite(result):
             return None
@@ -480,6 +522,29 @@ def _eval_formula(equation: str, output_tr: str, unit_y: str, dbh: float):
         return None
 
 
+def _group_by_genus(table: dict) -> dict:
+    """Genus -> records whose name starts with "<genus> ", in dict order (as the old scans)."""
+    index = {}
+    for name, rec in table.items():
+        genus, sep, _ = name.partition(" ")
+        if sep:
+            index.setdefault(genus, []).append(rec)
+    return index
+
+
+@lru_cache(maxsize=None)
+def _compile_vector_formula(equation: str):
+    """Compile a GlobAllomeTree equation over a numpy DBH array `dbh_arr` once. None if unparseable."""
+    f = str(equation).replace('^','**').replace('X','dbh_arr')
+    f = (f.replace('ln(','np.log(').replace('log10(','np.log10(')
+          .replace('Log10(','np.log10(').replace('log(','np.log(')
+          .replace('Log(','np.log(').replace('exp(','np.exp(')
+          .replace('sqrt(','np.sqrt('))
+    try:
+        return compile(f, "<allometry>", "eval")
+    except (SyntaxError, ValueError):
+        return None
+
 # ── Main simulator class ───────────────────────────────────────────────────────
 class CarbonCreditSimulator:
 
@@ -511,20 +576,33 @@ class CarbonCreditSimulator:
         print(f"[CarbonSim] Tier1 GlobAllomeTree: {len(self.globallometree)} species")
         print(f"[CarbonSim] Tier2 simple allometric: {len(self.simple_cache)} species")
         self._agb_cache = {}   # memoize equation lookups per species
+        # Genus fallbacks: records per genus, instead of scanning every species
+        self._glob_genus      = _group_by_genus(self.globallometree)
+        self._simple_genus    = _group_by_genus(self.simple_cache)
+        self._glob_by_genus   = {g: recs[0] for g, recs in self._glob_genus.items()}
+        self._simple_by_genus = {g: recs[0] for g, recs in self._simple_genus.items()}
+        self._monotonic_cache = {}   # (equation, output_tr, unit_y) -> bool
+        self._agb_kg_cache    = {}   # (dbh, species, region) -> kg, bounded by AGB_KG_CACHE_MAX
 
     # ── Loaders ────────────────────────────────────────────────────────────────
 
     def _load_simple_csv(self, path):
         try:
-            df = pd.read_csv(path)
-            for _, row in df.iterrows():
-                sp = str(row.get("species_name", "")).strip()
+            # Only the Tier-2 columns; a callable tolerates optional ones being absent
+            df = pd.read_csv(path, usecols=lambda c: c in SIMPLE_CSV_COLUMNS)
+            col = lambda name, default: df[name] if name in df else pd.Series(default, index=df.index)
+            # Column-wise prep, then zip over plain lists (no per-row Series)
+            species = col("species_name", "").fillna("").astype(str).str.strip()
+            wd      = col("wood_density", 0.5).fillna(0.5).replace(0, 0.5).astype(float)
+            region  = col("region", "tropical").fillna("tropical").astype(str).str.strip().str.lower()
+            for sp, a, b, w, rg in zip(species.tolist(), df["a"].astype(float).tolist(),
+                                       df["b"].astype(float).tolist(), wd.tolist(), region.tolist()):
                 if sp:
                     self.simple_cache[sp] = {
-                        "a"      : float(row["a"]),
-                        "b"      : float(row["b"]),
-                        "wd"     : float(row.get("wood_density", 0.5) or 0.5),
-                        "region" : str(row.get("region", "tropical")).strip().lower(),
+                        "a"      : a,
+                        "b"      : b,
+                        "wd"     : w,
+                        "region" : rg,
                         "citation": "allometric_equations.csv (project dataset)",
                     }
         except Exception as e:
@@ -646,9 +724,7 @@ class CarbonCreditSimulator:
         # Tier 1: GlobAllomeTree exact
         rec = self.globallometree.get(sp)
         if not rec and genus:
-            for csp, r in self.globallometree.items():
-                if csp.startswith(genus + " "):
-                    rec = r; break
+            rec = self._glob_by_genus.get(genus)
         if rec:
             self._agb_cache[sp] = ("globallometree", rec)
             return self._agb_cache[sp]
@@ -656,17 +732,14 @@ class CarbonCreditSimulator:
         # Tier 2: simple allometric
         s = self.simple_cache.get(sp)
         if not s and genus:
-            for csp, sv in self.simple_cache.items():
-                if csp.startswith(genus + " "):
-                    s = sv; break
+            s = self._simple_by_genus.get(genus)
         if s:
             self._agb_cache[sp] = ("simple", s)
             return self._agb_cache[sp]
 
         # Tier 3: IPCC default
-        defaults = {"tropical":(0.0509,2.50),"temperate":(0.065,2.38),"boreal":(0.085,2.32)}
         rg = str(region).strip().lower()
-        self._agb_cache[sp] = ("default", defaults.get(rg, defaults["tropical"]))
+        self._agb_cache[sp] = ("default", TIER3_ZONE_DEFAULTS.get(rg, TIER3_ZONE_DEFAULTS["tropical"]))
         return self._agb_cache[sp]
 
     def calculate_agb_kg(self, dbh_cm: float, species: str, region: str) -> float:
@@ -675,6 +748,20 @@ class CarbonCreditSimulator:
         sp  = " ".join(str(species).strip().split())
         rg  = str(region).strip().lower()
 
+        # Cohort DBH trajectories are deterministic, so the same values recur across runs
+        # The simulator is shared across sessions, so never re-read the dict after
+        # storing — another thread may have cleared it in between
+        key = (dbh, sp, rg)
+        val = self._agb_kg_cache.get(key)
+        if val is None:
+            val = self._lookup_agb_kg(dbh, sp, rg)
+            if len(self._agb_kg_cache) >= AGB_KG_CACHE_MAX:
+                self._agb_kg_cache.clear()
+            self._agb_kg_cache[key] = val
+        return val
+
+    def _lookup_agb_kg(self, dbh: float, sp: str, rg: str) -> float:
+        """Tier 1 -> 2 -> 3 AGB for one tree; inputs already normalized by calculate_agb_kg."""
         # Sanity threshold: at DBH=10, a tree should weigh at least AGB_SANITY_MIN_KG
         # This filters equations fitted only to seedlings or saplings
         def _sane(val):
@@ -685,10 +772,14 @@ class CarbonCreditSimulator:
         def _monotonic(rec_g):
             """Check equation is monotonically increasing: AGB(30) > AGB(10)*2"""
             try:
-                v10 = _eval_formula(rec_g['equation'], rec_g['output_tr'], rec_g['unit_y'], 10.0)
-                v30 = _eval_formula(rec_g['equation'], rec_g['output_tr'], rec_g['unit_y'], 30.0)
-                if v10 is None or v30 is None: return False
-                return v30 > v10 * 1.5  # AGB at DBH=30 must be >1.5x AGB at DBH=10
+                key = (rec_g['equation'], rec_g['output_tr'], rec_g['unit_y'])
+                if key not in self._monotonic_cache:
+                    v10 = _eval_formula(*key, 10.0)
+                    v30 = _eval_formula(*key, 30.0)
+                    # AGB at DBH=30 must be >1.5x AGB at DBH=10
+                    self._monotonic_cache[key] = (v10 is not None and v30 is not None
+                                                  and v30 > v10 * 1.5)
+                return self._monotonic_cache[key]
             except:
                 return False
 
@@ -702,8 +793,9 @@ class CarbonCreditSimulator:
         genus = sp.split()[0] if sp else ""
         if genus:
             # Only use genus fallback if same region — avoids tropical equations on desert species
-            for csp, r in self.globallometree.items():
-                if csp.startswith(genus + " ") and r.get('region','') == rg and _monotonic(r):
+            congeners = self._glob_genus.get(genus, ())
+            for r in congeners:
+                if r.get('region','') == rg and _monotonic(r):
                     val = _eval_formula(r['equation'], r['output_tr'], r['unit_y'], dbh)
                     if _sane(val): return val
             # For non-tropical regions, stop here — don't cross-apply tropical genus equations
@@ -711,8 +803,8 @@ class CarbonCreditSimulator:
                 pass  # Fall through to Tier 2
             else:
                 # Tropical regions: allow cross-genus fallback
-                for csp, r in self.globallometree.items():
-                    if csp.startswith(genus + " ") and _monotonic(r):
+                for r in congeners:
+                    if _monotonic(r):
                         val = _eval_formula(r['equation'], r['output_tr'], r['unit_y'], dbh)
                         if _sane(val): return val
 
@@ -724,17 +816,12 @@ class CarbonCreditSimulator:
 
         # Tier 2: simple allometric genus match
         if genus:
-            for csp, s in self.simple_cache.items():
-                if csp.startswith(genus + " "):
-                    val = s["a"] * (dbh ** s["b"])
-                    if val > 0: return float(val)
+            for s in self._simple_genus.get(genus, ()):
+                val = s["a"] * (dbh ** s["b"])
+                if val > 0: return float(val)
 
         # Tier 3: IPCC 2019 regional default
-        defaults = {"tropical":(0.0509,2.50),"temperate":(0.065,2.38),"boreal":(0.085,2.32),
-                    "desert":(0.048,2.41),"dry_tropical":(0.050,2.40),"mediterranean":(0.065,2.35),
-                    "montane":(0.060,2.38),"mangrove":(0.055,2.42),"flooded":(0.058,2.40),
-                    "tropical_grassland":(0.048,2.41)}
-        a, b = defaults.get(rg, defaults["tropical"])
+        a, b = TIER3_DEFAULTS.get(rg, TIER3_DEFAULTS["tropical"])
         return max(a * (dbh ** b), 0.01)
 
     def get_equation_info(self, species: str) -> dict:
@@ -744,9 +831,7 @@ class CarbonCreditSimulator:
 
         rec = self.globallometree.get(sp)
         if not rec and genus:
-            for cached_sp, r in self.globallometree.items():
-                if cached_sp.startswith(genus + " "):
-                    rec = r; break
+            rec = self._glob_by_genus.get(genus)
 
         if rec:
             return {
@@ -762,9 +847,7 @@ class CarbonCreditSimulator:
 
         s = self.simple_cache.get(sp)
         if not s and genus:
-            for cached_sp, sv in self.simple_cache.items():
-                if cached_sp.startswith(genus + " "):
-                    s = sv; break
+            s = self._simple_by_genus.get(genus)
         if s:
             return {
                 "tier"    : "Simple allometric (Tier 2)",
@@ -809,25 +892,8 @@ class CarbonCreditSimulator:
         Annual DBH increment (mm/yr) with management uplifts.
         Base rates from IPCC 2019 Table 4.9 / 4.11.
         """
-        rg = region.lower()
-        fast = species in FAST_SPECIES
-
-        if rg == "tropical":
-            base = 20.0 if fast else 12.0   # IPCC 2019 Table 4.11
-        elif rg in ("dry_tropical", "tropical_grassland"):
-            base = 14.0 if fast else 8.0    # Tropical dry — slower than moist
-        elif rg == "desert":
-            base = 8.0 if fast else 5.0     # Arid species — slow growth
-        elif rg == "mediterranean":
-            base = 10.0 if fast else 7.0    # Mediterranean
-        elif rg == "montane":
-            base = 8.0 if fast else 5.0     # High-altitude — slow
-        elif rg in ("mangrove", "flooded"):
-            base = 10.0 if fast else 7.0    # Wetland species
-        elif rg == "temperate":
-            base = 10.0 if fast else 8.0    # IPCC 2019 Table 4.9
-        else:  # boreal and unknown
-            base = 7.0 if fast else 5.0     # IPCC 2019 Table 4.9
+        fast, other = DBH_GROWTH_MM.get(region.lower(), DBH_GROWTH_MM_DEFAULT)
+        base = fast if species in FAST_SPECIES else other
 
         mult = 1.0
         if management.get("irrigation"):  mult *= 1.15  # IPCC 2019 §2.3.2
@@ -884,11 +950,13 @@ class CarbonCreditSimulator:
             n_trees = int(sim_area_ha * density * pct)
             if n_trees <= 0:
                 continue
+            # Every tree in a cohort is planted at 1 cm and gets the same
+            # growth, so one DBH plus a survivor count describes the cohort.
             cohorts.append({
                 "species"  : sp,
                 "region"   : region,
                 "count"    : n_trees,
-                "dbh_arr"  : np.full(n_trees, 1.0),   # start at 1 cm DBH
+                "dbh_cm"   : 1.0,   # start at 1 cm DBH
             })
 
         # ── Soil carbon ──────────────────────────────────────────────────────
@@ -898,6 +966,7 @@ class CarbonCreditSimulator:
             biochar=management.get("biochar", False)
         )
         annual_soil_co2e = soil_result["annual_co2e"]  # will be scaled with area_scale
+        soil_co2e_year   = round(annual_soil_co2e * area_scale, 2)  # same every year
 
         # ── Survival multipliers ─────────────────────────────────────────────
         # Weed control +5%, fencing +7% (documented management actions)
@@ -907,121 +976,125 @@ class CarbonCreditSimulator:
         if management.get("fencing", management.get("fence", False)):
             surv_mult *= 1.07
 
-        # ── Year-by-year loop ────────────────────────────────────────────────
-        yearly_results = []
+        # ── Mortality / management phases ────────────────────────────────────
+        # Phased mortality and management for managed restoration projects.
+        # Each phase's management dict is built once, not once per year.
+        if managed_restoration:
+            # Intensive phase (yrs 1-2): immediate replanting = 0% net mortality,
+            # full uplifts
+            weaned = dict(management)
+            weaned["irrigation"] = False       # transition (yrs 3-4): irrigation weaned off
+            independent = dict(weaned)
+            independent["nutrients"] = False   # independent (yrs 5+): no added nutrients
+            # Note: biochar stays active (17,000yr longevity per PNNL study)
+            # TerraPod growth multiplier remains (established root system)
+            phases = {
+                "intensive"  : (0.0,   management),
+                "transition" : (0.005, weaned),
+                "independent": (0.015, independent),
+            }
+        else:
+            phases = {"standard": (annual_mortality, management)}
+        phase_mort = {name: max(0.0, mort / surv_mult) for name, (mort, _) in phases.items()}
+
+        # ── Per-cohort constants (fixed for the whole project) ───────────────
+        for c in cohorts:
+            sp, rg = c["species"], c["region"]
+            # Species-specific RSR preferred over regional default
+            rsr = SPECIES_RSR.get(sp, (None,))[0]
+            if rsr is None:
+                rsr = RSR.get(rg.lower(), RSR_DEFAULT)
+            c["bgb_mult"]  = 1.0 + rsr
+            c["tier"], c["rec"] = self._get_species_rec(sp, rg)
+            c["growth_cm"] = {name: self._get_dbh_growth_mm(sp, rg, mgmt) / 10.0
+                              for name, (_, mgmt) in phases.items()}
+
+        # ── Whole-project trajectories ───────────────────────────────────────
+        # Growth and mortality depend only on the year's phase, so every series
+        # is built over the year axis at once; only the whole-tree survivor
+        # count is stepped year by year (it is truncated each year).
+        if not managed_restoration:
+            year_phase = ["standard"] * project_years
+        else:
+            year_phase = ["intensive" if y <= 2 else "transition" if y <= 4 else "independent"
+                          for y in range(1, project_years + 1)]
+        # Fraction of trees kept each year; shared by every cohort
+        year_keep = [1.0 - phase_mort[p] for p in year_phase]
+
         eq_tiers = {c["species"]: self.get_equation_info(c["species"])["tier"]
                     for c in cohorts}
-
-        for year in range(1, project_years + 1):
-            total_biomass_kg = 0.0
-
-            # Phased mortality and management for managed restoration projects
-            if managed_restoration:
-                if year <= 2:
-                    # Intensive phase: immediate replanting = 0% net mortality
-                    year_mortality = 0.0
-                    year_mgmt = dict(management)   # full uplifts
-                elif year <= 4:
-                    # Transition phase: irrigation weaning, light replanting
-                    year_mortality = 0.005
-                    year_mgmt = dict(management)
-                    year_mgmt["irrigation"] = False  # irrigation weaned off
-                else:
-                    # Independent phase: established trees, MRV only
-                    # Trees are self-sustaining but keep TerraPod biochar benefit
-                    year_mortality = 0.015
-                    year_mgmt = dict(management)
-                    year_mgmt["irrigation"] = False  # no irrigation needed
-                    year_mgmt["nutrients"]  = False  # no added nutrients
-                    # Note: biochar stays active (17,000yr longevity per PNNL study)
-                    # TerraPod growth multiplier remains (established root system)
+        total_biomass_kg = np.zeros(project_years)
+        trees_alive      = np.zeros(project_years, dtype=np.int64)
+
+        for c in cohorts:
+            sp, rg = c["species"], c["region"]
+
+            # Mortality — survivors stay whole trees, truncated every year
+            counts = np.zeros(project_years, dtype=np.int64)
+            n = c["count"]
+            for i, keep in enumerate(year_keep):
+                n = int(n * keep)
+                if n <= 0:
+                    break   # cohort is gone for the rest of the project
+                counts[i] = n
+            alive = counts > 0
+            trees_alive += counts
+
+            # Growth — DBH only advances in years the cohort has survivors
+            growth = np.array([c["growth_cm"][p] for p in year_phase])
+            dbh = np.cumsum(np.concatenate(([c["dbh_cm"]], np.where(alive, growth, 0.0))))[1:]
+
+            # Biomass — per-tree AGB at the cohort DBH x survivor count
+            if c["tier"] == "globallometree" and c["rec"]:
+                # Tier 1: GlobAllomeTree equation over every year's DBH at once
+                rec = c["rec"]
+                tr  = rec['output_tr']
+                uy  = rec['unit_y']
+                code = _compile_vector_formula(str(rec['equation']))
+                try:
+                    if code is None:
+                        raise ValueError("Unparseable equation — fall through")
+                    result = eval(code, {"np": np, "dbh_arr": dbh, "__builtins__": {}})
+                    result = np.where(np.isfinite(result) & (result > 0), result, 0.0)
+                    if tr in ('log','ln'): result = np.exp(result)
+                    elif tr in ('log10',): result = 10.0 ** result
+                    if uy == 'g': result = result / 1000.0
+                    elif uy == 'mg': result = result * 1000.0
+                    per_tree = np.array(np.broadcast_to(result, dbh.shape), dtype=float)
+                    # Sanity check: value per tree should be plausible
+                    expected_min = AGB_SANITY_MIN_KG * (dbh / 10.0) ** 2
+                    implausible  = per_tree < expected_min * 0.1
+                except Exception:
+                    per_tree    = np.zeros(project_years)
+                    implausible = np.ones(project_years, dtype=bool)
+                # Fall back to the scalar calculation with sanity checks
+                for i in np.flatnonzero(implausible & alive):
+                    per_tree[i] = self.calculate_agb_kg(dbh[i], sp, rg)
+            elif c["tier"] == "simple":
+                per_tree = c["rec"]["a"] * (dbh ** c["rec"]["b"])
             else:
-                year_mortality = annual_mortality
-                year_mgmt = management
-
-            for c in cohorts:
-                if c["count"] <= 0:
-                    continue
-
-                # Mortality
-                effective_mort = max(0.0, year_mortality / surv_mult)
-                survivors = max(0, int(c["count"] * (1.0 - effective_mort)))
-
-                if survivors < len(c["dbh_arr"]):
-                    c["dbh_arr"] = np.sort(c["dbh_arr"])[-survivors:]
-                c["count"] = survivors
-
-                if c["count"] <= 0:
-                    continue
-
-                # Growth
-                growth_mm = self._get_dbh_growth_mm(
-                    c["species"], c["region"], year_mgmt
-                )
-                c["dbh_arr"] = c["dbh_arr"] + (growth_mm / 10.0)
-
-                # Biomass — vectorized for speed
-                # Species-specific RSR preferred over regional default
-                rsr = SPECIES_RSR.get(c["species"], (None,))[0]
-                if rsr is None:
-                    rsr = RSR.get(c["region"].lower(), RSR_DEFAULT)
-                # Get equation coefficients once, apply to all trees
-                dbh_arr = c["dbh_arr"]
-                sp  = c["species"]
-                rg  = c["region"]
-                # Try Tier 1: GlobAllomeTree vectorized (uses memoized lookup)
-                _tier, _rec = self._get_species_rec(sp, rg)
-                rec = _rec if _tier == "globallometree" else None
-                if rec:
-                    # Vectorized eval using numpy
-                    eq  = rec['equation']
-                    tr  = rec['output_tr']
-                    uy  = rec['unit_y']
-                    try:
-                        f = str(eq).replace('^','**').replace('X','dbh_arr')
-                        f = (f.replace('ln(','np.log(').replace('log10(','np.log10(')
-                              .replace('Log10(','np.log10(').replace('log(','np.log(')
-                              .replace('Log(','np.log(').replace('exp(','np.exp(')
-                              .replace('sqrt(','np.sqrt('))
-                        result = eval(f, {"np": np, "dbh_arr": dbh_arr, "__builtins__": {}})
-                        result = np.where(np.isfinite(result) & (result > 0), result, 0.0)
-                        if tr in ('log','ln'): result = np.exp(result)
-                        elif tr in ('log10',): result = 10.0 ** result
-                        if uy == 'g': result = result / 1000.0
-                        elif uy == 'mg': result = result * 1000.0
-                        # Sanity check: median value per tree should be plausible
-                        med = float(np.median(result[result > 0])) if np.any(result > 0) else 0
-                        ref_dbh = float(np.median(dbh_arr))
-                        expected_min = AGB_SANITY_MIN_KG * (ref_dbh / 10.0) ** 2
-                        if med < expected_min * 0.1:
-                            raise ValueError("Implausibly low — fall through")
-                        agb_kg = float(np.sum(result))
-                    except:
-                        # Fall back to per-tree calculation with sanity checks
-                        agb_kg = float(np.sum([self.calculate_agb_kg(d, sp, rg) for d in dbh_arr]))
-                else:
-                    # Tier 2/3: use memoized lookup
-                    _tier2, _rec2 = self._get_species_rec(sp, rg)
-                    if _tier2 == "simple":
-                        agb_kg = float(np.sum(_rec2["a"] * (dbh_arr ** _rec2["b"])))
-                    else:
-                        a, b = _rec2
-                        agb_kg = float(np.sum(a * (dbh_arr ** b)))
-                total_biomass_kg += agb_kg * (1.0 + rsr)
-
-            carbon_t   = (total_biomass_kg / 1000.0) * CARBON_FRACTION
-            co2e_gross = carbon_t * CO2E_FACTOR
-
-            yearly_results.append({
+                a, b = c["rec"]
+                per_tree = a * (dbh ** b)
+            total_biomass_kg += np.where(alive, per_tree * counts * c["bgb_mult"], 0.0)
+
+        carbon_t   = (total_biomass_kg / 1000.0) * CARBON_FRACTION
+        co2e_gross = total_biomass_kg * BIOMASS_KG_TO_CO2E_T
+
+        yearly_results = [
+            {
                 "year"              : year,
-                "trees_total"       : round(sum(c["count"] for c in cohorts) * area_scale),
-                "biomass_t"         : round(total_biomass_kg / 1000.0 * area_scale, 2),
-                "carbon_t"          : round(carbon_t * area_scale, 2),
-                "co2e_gross_t"      : round(co2e_gross * area_scale, 2),
-                "soil_co2e_gross_t" : round(annual_soil_co2e * area_scale, 2),
+                "trees_total"       : round(trees * area_scale),
+                "biomass_t"         : round(biomass_kg / 1000.0 * area_scale, 2),
+                "carbon_t"          : round(c_t * area_scale, 2),
+                "co2e_gross_t"      : round(co2e_t * area_scale, 2),
+                "soil_co2e_gross_t" : soil_co2e_year,
                 "equation_tiers"    : eq_tiers,
-            })
-
+            }
+            for year, trees, biomass_kg, c_t, co2e_t in zip(
+                range(1, project_years + 1), trees_alive.tolist(),
+                total_biomass_kg.tolist(), carbon_t.tolist(), co2e_gross.tolist(),
+            )
+        ]
         return yearly_results
 
     # ── Audit trail ───────────────────────────────────────────────────────────